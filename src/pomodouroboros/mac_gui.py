@@ -3,35 +3,31 @@ from __future__ import annotations
 
 from dataclasses import dataclass, field
 from datetime import date, datetime
-from time import time as rawSeconds
-from typing import Callable, ClassVar, Iterable, List, Optional, Tuple
+from time import time as rawSeconds, tzset
+from typing import Callable, ClassVar, Dict, List, Optional, Tuple
 
-from Foundation import NSRect
+import objc
+from Foundation import NSNull, NSRect, NSSize
 from twisted.internet.interfaces import IReactorTCP
 from twisted.internet.task import LoopingCall
-from twisted.python.failure import Failure
 
+import logging
 import math
 from AppKit import (
-    NSAlert,
-    NSAlertFirstButtonReturn,
     NSApp,
-    NSApplicationDidChangeScreenParametersNotification,
     NSBackingStoreBuffered,
-    NSBezierPath,
     NSBorderlessWindowMask,
     NSColor,
     NSEvent,
     NSFloatingWindowLevel,
-    NSNotificationCenter,
     NSScreen,
-    NSTextField,
     NSView,
     NSWindow,
     NSWindowCollectionBehaviorCanJoinAllSpaces,
     NSWindowCollectionBehaviorStationary,
 )
 from dateutil.tz import tzlocal
+from Quartz import CALayer
 from pomodouroboros.notifs import askForIntent, notify, setupNotifications
 from pomodouroboros.pommodel import (
     Break,
@@ -44,40 +40,89 @@ from pomodouroboros.quickapp import Actionable, Status, mainpoint, quit
 from pomodouroboros.storage import TEST_MODE, loadOrCreateDay, saveDay
 
 
-fillRect = NSBezierPath.fillRect_
+# NSColor's named-color constructors are bridge calls that always return the
+# same colors, so look them up once rather than on every progress update.
+_GREEN = NSColor.greenColor()
+_RED = NSColor.redColor()
+_YELLOW = NSColor.yellowColor()
+_PURPLE = NSColor.purpleColor()
+_BLUE = NSColor.blueColor()
+_LIGHT_GRAY = NSColor.lightGrayColor()
+_DARK_GRAY = NSColor.darkGrayColor()
+_ORANGE = NSColor.orangeColor()
+
+log = logging.getLogger(__name__)
+
+# now() is called on every tick, so don't construct a new tzlocal each time;
+# refreshLocalTimezone updates this if the system time zone changes.
+_LOCAL_TZ = tzlocal()
 
 
 class BigProgressView(NSView):
     """
-    View that draws a big red/green progress bar rectangle
+    View that shows a big red/green progress bar rectangle, composited by
+    Core Animation from two solid-color sublayers.
     """
 
     _percentage = 0.0
-    _leftColor = NSColor.greenColor()
-    _rightColor = NSColor.redColor()
+    _lastPixel = -1
+    _leftColor = _GREEN
+    _rightColor = _RED
+
+    def init(self) -> BigProgressView:
+        self = objc.super(BigProgressView, self).init()
+        self.setWantsLayer_(True)
+        self._leftLayer = CALayer.layer()
+        self._rightLayer = CALayer.layer()
+        # Stand-alone layers get implicit 0.25s animations; the bar should
+        # snap to each new split and color, just like drawing it would.
+        noAnimations = {
+            "position": NSNull.null(),
+            "bounds": NSNull.null(),
+            "backgroundColor": NSNull.null(),
+        }
+        self._leftLayer.setActions_(noAnimations)
+        self._rightLayer.setActions_(noAnimations)
+        self._leftLayer.setBackgroundColor_(self._leftColor.CGColor())
+        self._rightLayer.setBackgroundColor_(self._rightColor.CGColor())
+        self.layer().addSublayer_(self._leftLayer)
+        self.layer().addSublayer_(self._rightLayer)
+        return self
+
+    def setFrameSize_(self, newSize: NSSize) -> None:
+        objc.super(BigProgressView, self).setFrameSize_(newSize)
+        self._lastPixel = -1
+        self.setPercentage_(self._percentage)
 
     def setPercentage_(self, newPercentage: float) -> None:
         """
-        Set the percentage-full here.
+        Set the percentage-full here.  Only re-layout when the split point
+        actually moves to a different pixel column.
         """
         self._percentage = newPercentage
-        self.setNeedsDisplay_(True)
+        bounds = self.bounds()
+        newPixel = int(newPercentage * bounds.size.width)
+        if newPixel != self._lastPixel:
+            self._lastPixel = newPixel
+            split = newPercentage * bounds.size.width
+            self._leftLayer.setFrame_(
+                NSRect((0, 0), (split, bounds.size.height))
+            )
+            self._rightLayer.setFrame_(
+                NSRect(
+                    (split, 0), (bounds.size.width - split, bounds.size.height)
+                )
+            )
 
     def setLeftColor_(self, newLeftColor: NSColor) -> None:
-        self._leftColor = newLeftColor
+        if newLeftColor is not self._leftColor:
+            self._leftColor = newLeftColor
+            self._leftLayer.setBackgroundColor_(newLeftColor.CGColor())
 
     def setRightColor_(self, newRightColor: NSColor) -> None:
-        self._rightColor = newRightColor
-
-    def drawRect_(self, rect: NSRect) -> None:
-        bounds = self.bounds()
-        split = self._percentage * (bounds.size.width)
-        self._leftColor.set()
-        fillRect(NSRect((0, 0), (split, bounds.size.height)))
-        self._rightColor.set()
-        fillRect(
-            NSRect((split, 0), (bounds.size.width - split, bounds.size.height))
-        )
+        if newRightColor is not self._rightColor:
+            self._rightColor = newRightColor
+            self._rightLayer.setBackgroundColor_(newRightColor.CGColor())
 
     def canBecomeKeyView(self) -> bool:
         return False
@@ -114,6 +159,9 @@ NSModalResponse = int
 
 
 def getString(title: str, question: str, defaultValue: str) -> str:
+    # Only needed when prompting, so don't resolve these at import time.
+    from AppKit import NSAlert, NSAlertFirstButtonReturn, NSTextField
+
     msg = NSAlert.alloc().init()
     msg.addButtonWithTitle_("OK")
     msg.addButtonWithTitle_("Cancel")
@@ -151,10 +199,33 @@ class MacPomObserver(object):
         (0.75, "Time to finish up."),
         (0.95, "Almost done!"),
     ]
+    responseParameters: ClassVar[
+        Dict[IntentionResponse, Tuple[NSColor, NSColor, float, float, float]]
+    ] = {
+        # (leftColor, rightColor, baseAlphaValue, alphaVariance,
+        #  pulseMultiplier)
+        # Urgent colors and a boosted pulse for setting an intention
+        IntentionResponse.CanBeSet: (_YELLOW, _PURPLE, 0.25, 0.03, 3.0),
+        # Nice soothing "You're doing it!" colors for remembering to set
+        # intention
+        IntentionResponse.AlreadySet: (_GREEN, _BLUE, 0.15, 0.015, 1.5),
+        # Neutral "take it easy" colors and a calmer pulse for breaks
+        IntentionResponse.OnBreak: (
+            _LIGHT_GRAY,
+            _DARK_GRAY,
+            0.15,
+            0.0075,
+            0.75,
+        ),
+        # Angry "You forgot" colors for setting it too late
+        IntentionResponse.TooLate: (_ORANGE, _RED, 0.15, 0.015, 1.5),
+    }
     active: bool = field(default=False)
+    lastAlpha: float = field(default=-1.0)
+    lastResponse: Optional[IntentionResponse] = field(default=None)
 
     def __post_init__(self):
-        print("post-init", self.active)
+        log.debug("post-init %s", self.active)
         self.window.setIsVisible_(self.active)
 
     def setWindow(self, newWindow: HUDWindow) -> None:
@@ -162,14 +233,15 @@ class MacPomObserver(object):
         Change the window to be the new window.
         """
         self.window = newWindow
-        print("set-window", self.active)
+        self.lastAlpha = -1.0
+        log.debug("set-window %s", self.active)
         newWindow.setIsVisible_(self.active)
 
     def breakStarting(self, startingBreak: Break) -> None:
         """
         A break is starting.
         """
-        print("break start")
+        log.debug("break start")
         self.active = True
         self.window.setIsVisible_(True)
         notify("Starting Break", "Take it easy for a while.")
@@ -178,7 +250,7 @@ class MacPomObserver(object):
         """
         A pomodoro is starting; time to express an intention.
         """
-        print("pom start")
+        log.debug("pom start")
         self.active = True
         self.lastThreshold = 0.0
         self.window.setIsVisible_(True)
@@ -206,58 +278,51 @@ class MacPomObserver(object):
         percentageElapsed% done.  canSetIntention tells you the likely outcome
         of setting the intention.
         """
-        baseAlphaValue = 0.15
-        alphaVariance = 0.015
-        pulseMultiplier = 1.5
-        if canSetIntention == IntentionResponse.CanBeSet:
-            self.progressView.setLeftColor_(NSColor.yellowColor())
-            self.progressView.setRightColor_(NSColor.purpleColor())
-            # boost the urgency on setting an intention
-            baseAlphaValue += 0.1
-            alphaVariance *= 2
-            pulseMultiplier *= 2
-        if canSetIntention == IntentionResponse.AlreadySet:
-            # Nice soothing "You're doing it!" colors for remembering to set
-            # intention
-            self.progressView.setLeftColor_(NSColor.greenColor())
-            self.progressView.setRightColor_(NSColor.blueColor())
-            if (
-                isinstance(interval, Pomodoro)
-                and interval.intention is not None
-            ):
-                # TODO: maybe put reminder messages in the model?
-                for pct, message in self.thresholds:
-                    if self.lastThreshold <= pct and percentageElapsed > pct:
-                        self.lastThreshold = percentageElapsed
-                        notify(
-                            "Remember Your Intention",
-                            message,
-                            "“" + interval.intention.description + "”",
-                        )
-        elif canSetIntention == IntentionResponse.OnBreak:
-            # Neutral "take it easy" colors for breaks
-            pulseMultiplier /= 2
-            alphaVariance /= 2
-            self.progressView.setLeftColor_(NSColor.lightGrayColor())
-            self.progressView.setRightColor_(NSColor.darkGrayColor())
-        elif canSetIntention == IntentionResponse.TooLate:
-            # Angry "You forgot" colors for setting it too late
-            self.progressView.setLeftColor_(NSColor.orangeColor())
-            self.progressView.setRightColor_(NSColor.redColor())
+        (
+            leftColor,
+            rightColor,
+            baseAlphaValue,
+            alphaVariance,
+            pulseMultiplier,
+        ) = self.responseParameters[canSetIntention]
+        if canSetIntention != self.lastResponse:
+            # Colors only change when the response does, so don't re-send
+            # them across the bridge on every tick.
+            self.lastResponse = canSetIntention
+            self.progressView.setLeftColor_(leftColor)
+            self.progressView.setRightColor_(rightColor)
+        if (
+            canSetIntention == IntentionResponse.AlreadySet
+            and isinstance(interval, Pomodoro)
+            and interval.intention is not None
+        ):
+            # TODO: maybe put reminder messages in the model?
+            for pct, message in self.thresholds:
+                if self.lastThreshold <= pct and percentageElapsed > pct:
+                    self.lastThreshold = percentageElapsed
+                    notify(
+                        "Remember Your Intention",
+                        message,
+                        "“" + interval.intention.description + "”",
+                    )
         self.progressView.setPercentage_(percentageElapsed)
         alphaValue = (
             math.sin(rawSeconds() * pulseMultiplier) * alphaVariance
         ) + baseAlphaValue
         self.active = True
         self.window.setIsVisible_(True)
-        self.window.setAlphaValue_(alphaValue)
+        # Changes smaller than one 8-bit alpha step aren't visible; don't
+        # bother sending them to the window server.
+        if abs(alphaValue - self.lastAlpha) > 1 / 255:
+            self.lastAlpha = alphaValue
+            self.window.setAlphaValue_(alphaValue)
 
     def dayOver(self):
         """
         The day is over, so there will be no more intervals.
         """
         self.active = False
-        print("The day is over. Goodbye.")
+        log.info("The day is over. Goodbye.")
         self.window.setIsVisible_(False)
 
 
@@ -304,10 +369,8 @@ def expressIntention(day: Day, newIntention: str) -> None:
     """
     Express the given intention to the given day.
     """
-    intentionResult = day.expressIntention(
-        datetime.now(tz=tzlocal()), newIntention
-    )
-    print("IR", intentionResult)
+    intentionResult = day.expressIntention(now(), newIntention)
+    log.debug("IR %s", intentionResult)
     if intentionResult == IntentionResponse.WasSet:
         notify("Intention Set", f"“{newIntention}”")
     elif intentionResult == IntentionResponse.AlreadySet:
@@ -338,10 +401,10 @@ def expressIntention(day: Day, newIntention: str) -> None:
             "Internal Error",
             f"received {intentionResult}",
         )
-        print("very surprised:", intentionResult)
-    print("saving day")
+        log.error("very surprised: %s", intentionResult)
+    log.debug("saving day")
     saveDay(day)
-    print("saved")
+    log.debug("saved")
 
 
 def setIntention(day: Day) -> None:
@@ -351,22 +414,10 @@ def setIntention(day: Day) -> None:
             question="What is your intention?",
             defaultValue="",
         )
-        print("String Get")
+        log.debug("String Get")
         expressIntention(day, newIntention)
     except BaseException:
-        print(Failure().getTraceback())
-
-
-def thisAndPreviousPoms(day: Day) -> Iterable[Pomodoro]:
-    if day.pendingIntervals:
-        currentInterval = day.pendingIntervals[0]
-        if isinstance(currentInterval, Pomodoro):
-            yield currentInterval
-
-    if day.elapsedIntervals:
-        for each in reversed(day.elapsedIntervals):
-            if isinstance(each, Pomodoro):
-                yield each
+        log.exception("error while setting intention")
 
 
 def bonus(when: datetime, day: Day) -> None:
@@ -379,35 +430,55 @@ def bonus(when: datetime, day: Day) -> None:
 
 
 def now() -> datetime:
-    return datetime.now(tz=tzlocal())
+    return datetime.now(tz=_LOCAL_TZ)
+
+
+def refreshLocalTimezone() -> None:
+    """
+    The system time zone changed; pick up the new one.
+    """
+    global _LOCAL_TZ
+    tzset()
+    _LOCAL_TZ = tzlocal()
 
 
 def newDay(forDate: date) -> Day:
     if TEST_MODE:
-        print("Creating testing day")
+        log.info("Creating testing day")
         return Day.forTesting()
     else:
-        print("New production-mode date", forDate)
+        log.info("New production-mode date %s", forDate)
         return loadOrCreateDay(forDate)
 
 
-def labelForDay(day: Day) -> str:
+PomCounts = Tuple[int, int, int, int]
+
+
+def countsForDay(day: Day) -> PomCounts:
     """
-    Generate a textual label representing the success proportion of the given
-    day.
+    Count the successful, failed, un-evaluated, and pending pomodoros of the
+    given day.
     """
-    success = len(day.successfulPomodoros())
-    failed = len(day.failedPomodoros())
-    mystery = len(day.unEvaluatedPomodoros())
-    unfinished = len(day.pendingPomodoros())
+    return (
+        len(day.successfulPomodoros()),
+        len(day.failedPomodoros()),
+        len(day.unEvaluatedPomodoros()),
+        len(day.pendingPomodoros()),
+    )
+
+
+def labelForCounts(counts: PomCounts) -> str:
+    """
+    Generate a textual label representing the success proportion of a day,
+    given the pomodoro counts computed by L{countsForDay}.
+    """
+    success, failed, mystery, unfinished = counts
     icon = tomato if success > failed else can
-    title = icon + ": "
-    title += f"{success}✓ "
-    title += f"{failed}✗ "
+    parts = [icon, ": ", str(success), "✓ ", str(failed), "✗ "]
     if mystery:
-        title += f"{mystery}? "
-    title += f"{unfinished}…"
-    return title
+        parts += [str(mystery), "? "]
+    parts += [str(unfinished), "…"]
+    return "".join(parts)
 
 
 can = "🥫"
@@ -421,6 +492,14 @@ class DayManager(object):
     progress: BigProgressView
     day: Day = field(default_factory=lambda: newDay(date.today()))
     loopingCall: Optional[LoopingCall] = field(default=None)
+    lastCounts: Optional[PomCounts] = field(default=None)
+    activeInterval: ClassVar[float] = 1.0 / 10.0
+    "How often to update while the HUD is visible and animating."
+    idleInterval: ClassVar[float] = 1.0
+    "How often to update while there's no interval to show."
+    lastErrorTime: float = field(default=0.0)
+    errorLogInterval: ClassVar[float] = 10.0
+    "Minimum number of seconds between logged update errors."
 
     @classmethod
     def new(cls) -> DayManager:
@@ -435,7 +514,7 @@ class DayManager(object):
         return self
 
     def recreateWindow(self) -> None:
-        print("screens changed")
+        log.debug("screens changed")
         newWindow = makeOneWindow(self.progress)
         self.observer.setWindow(newWindow)
         oldWindow = self.window
@@ -462,53 +541,80 @@ class DayManager(object):
                 if present.date() != self.day.startTime.date():
                     self.day = newDay(date.today())
                 self.day.advanceToTime(present, self.observer)
-                status.item.setTitle_(labelForDay(self.day))
+                # The label only changes when a pomodoro changes state, so
+                # avoid rebuilding it and crossing the bridge every tick.
+                counts = countsForDay(self.day)
+                if counts != self.lastCounts:
+                    self.lastCounts = counts
+                    status.item.setTitle_(labelForCounts(counts))
+                self.setUpdateInterval(
+                    self.activeInterval
+                    if self.observer.active
+                    else self.idleInterval
+                )
             except BaseException:
-                print(Failure().getTraceback())
+                # This runs many times a second, so a persistent error would
+                # otherwise flood the log with identical tracebacks.
+                errorTime = rawSeconds()
+                if errorTime - self.lastErrorTime > self.errorLogInterval:
+                    self.lastErrorTime = errorTime
+                    log.exception("error while updating")
 
         self.loopingCall = LoopingCall(update)
-        self.loopingCall.start(1.0 / 10.0)
+        self.loopingCall.start(self.activeInterval)
+
+    def setUpdateInterval(self, interval: float) -> None:
+        """
+        Change how often the update loop runs, if it's not already running at
+        that rate.
+        """
+        oldCall = self.loopingCall
+        if oldCall is None or oldCall.interval == interval:
+            return
+        oldCall.stop()
+        self.loopingCall = LoopingCall(oldCall.f)
+        # We're usually called from within the loop itself, which has just
+        # done an update; don't immediately do another one.
+        self.loopingCall.start(interval, now=False)
 
     def setSuccess(self, succeeded: bool, index: int) -> None:
-        for idx, aPom in enumerate(thisAndPreviousPoms(self.day)):
-            if idx == -index:
-                # this error testing should really be in the model
-                if aPom.intention is None:
-                    notify(
-                        "Intention Not Set",
-                        "Automatic Failure",
-                        "Set an intention next time!",
-                    )
-                elif aPom.intention.wasSuccessful is not None:
-                    adjective = (
-                        "successful"
-                        if aPom.intention.wasSuccessful
-                        else "failed"
-                    )
-                    notify(
-                        "Success Previously Set",
-                        informativeText=f"Pomodoro Already {adjective}.",
-                    )
-                else:
-                    self.day.evaluateIntention(aPom, succeeded)
-                    adjective = (
-                        "successful"
-                        if aPom.intention.wasSuccessful
-                        else "failed"
-                    )
-                    noun = (
-                        "success"
-                        if aPom.intention.wasSuccessful
-                        else "failure"
-                    )
-                    notify(
-                        f"pomodoro {noun}".title(),
-                        informativeText=f"Marked Pomodoro {adjective}.",
-                    )
-                return
+        aPom = (
+            self.day.currentPomodoro()
+            if index == 0
+            else self.day.previousPomodoro()
+        )
+        if aPom is None:
+            return
+        # this error testing should really be in the model
+        if aPom.intention is None:
+            notify(
+                "Intention Not Set",
+                "Automatic Failure",
+                "Set an intention next time!",
+            )
+        elif aPom.intention.wasSuccessful is not None:
+            adjective = (
+                "successful" if aPom.intention.wasSuccessful else "failed"
+            )
+            notify(
+                "Success Previously Set",
+                informativeText=f"Pomodoro Already {adjective}.",
+            )
+        else:
+            self.day.evaluateIntention(aPom, succeeded)
+            adjective = (
+                "successful" if aPom.intention.wasSuccessful else "failed"
+            )
+            noun = "success" if aPom.intention.wasSuccessful else "failure"
+            notify(
+                f"pomodoro {noun}".title(),
+                informativeText=f"Marked Pomodoro {adjective}.",
+            )
 
 
 def callOnNotification(nsNotificationName: str, f: Callable[[], None]):
+    from Foundation import NSNotificationCenter
+
     NSNotificationCenter.defaultCenter().addObserver_selector_name_object_(
         Actionable.alloc().initWithFunction_(f).retain(),
         "doIt:",
@@ -519,6 +625,10 @@ def callOnNotification(nsNotificationName: str, f: Callable[[], None]):
 
 @mainpoint()
 def main(reactor: IReactorTCP) -> None:
+    from AppKit import NSApplicationDidChangeScreenParametersNotification
+    from Foundation import NSSystemTimeZoneDidChangeNotification
+
+    logging.basicConfig(level=logging.DEBUG if TEST_MODE else logging.INFO)
     setupNotifications()
     dayManager = DayManager.new()
     dayManager.start()
@@ -526,3 +636,6 @@ def main(reactor: IReactorTCP) -> None:
         NSApplicationDidChangeScreenParametersNotification,
         dayManager.recreateWindow,
     )
+    callOnNotification(
+        NSSystemTimeZoneDidChangeNotification, refreshLocalTimezone
+    )
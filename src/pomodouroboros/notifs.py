@@ -64,6 +64,18 @@ basicCategoryIdentifier = "BASIC_MESSAGE"
 
 theDelegate = NotificationDelegate.alloc().init()
 
+# Triggers are immutable, so every notification can share this one rather
+# than allocating a new one per request.
+oneSecondTrigger = (
+    UNTimeIntervalNotificationTrigger.triggerWithTimeInterval_repeats_(
+        1, False
+    )
+)
+
+
+def notificationRequestCompleted(error: NSError) -> None:
+    print("notification requested", error)
+
 
 def askForIntent(callback: Callable[[str], None]):
     identifier = "ask-for-intent"
@@ -72,18 +84,10 @@ def askForIntent(callback: Callable[[str], None]):
     content.setTitle_("Time To Set Intention")
     content.setBody_("What do you want to do right now?")
     content.setCategoryIdentifier_(categoryIdentifier)
-    trigger = (
-        UNTimeIntervalNotificationTrigger.triggerWithTimeInterval_repeats_(
-            1, False
-        )
-    )
     request = UNNotificationRequest.requestWithIdentifier_content_trigger_(
-        identifier, content, trigger
+        identifier, content, oneSecondTrigger
     )
 
-    def notificationRequestCompleted(error: NSError) -> None:
-        print("notification requested", error)
-
     notificationCenter.addNotificationRequest_withCompletionHandler_(
         request, notificationRequestCompleted
     )
@@ -97,20 +101,10 @@ def notify(title="", subtitle="", informativeText=""):
     content.setSubtitle_(subtitle)
     content.setBody_(informativeText)
 
-
-    trigger = (
-        UNTimeIntervalNotificationTrigger.triggerWithTimeInterval_repeats_(
-            1, False
-        )
-    )
-
     request = UNNotificationRequest.requestWithIdentifier_content_trigger_(
-        messageIdentifier, content, trigger
+        messageIdentifier, content, oneSecondTrigger
     )
 
-    def notificationRequestCompleted(error: NSError) -> None:
-        print("notification requested", error)
-
     notificationCenter.addNotificationRequest_withCompletionHandler_(
         request, notificationRequestCompleted
     )
@@ -293,6 +293,39 @@ class Day(object):
             allPending.pop(0)
         return allPending
 
+    def currentPomodoro(self) -> Optional[Pomodoro]:
+        """
+        The pomodoro that is in progress; or, if we're on a break, the one
+        that most recently elapsed.
+        """
+        if self.pendingIntervals:
+            current = self.pendingIntervals[0]
+            if isinstance(current, Pomodoro):
+                return current
+        return self._lastElapsedPomodoro(0)
+
+    def previousPomodoro(self) -> Optional[Pomodoro]:
+        """
+        The pomodoro before L{Day.currentPomodoro}.
+        """
+        if self.pendingIntervals and isinstance(
+            self.pendingIntervals[0], Pomodoro
+        ):
+            return self._lastElapsedPomodoro(0)
+        return self._lastElapsedPomodoro(1)
+
+    def _lastElapsedPomodoro(self, skip: int) -> Optional[Pomodoro]:
+        """
+        Find the most recently elapsed pomodoro, after skipping C{skip} more
+        recent ones.
+        """
+        for each in reversed(self.elapsedIntervals):
+            if isinstance(each, Pomodoro):
+                if not skip:
+                    return each
+                skip -= 1
+        return None
+
     def bonusPomodoro(self, currentTime: datetime) -> Pomodoro:
         """
         Create a new pomodoro at the end of the day.
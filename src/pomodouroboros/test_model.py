@@ -1,6 +1,6 @@
 from unittest import TestCase
 
-from .pommodel import Day
+from .pommodel import Day, Pomodoro
 from datetime import datetime, timezone, time, date
 
 
@@ -27,3 +27,34 @@ class DayTests(TestCase):
                          # broken into pom/break
             - 2,  # subtract out 2 breaks because the long breaks are contiguous
         )
+
+    def test_currentAndPreviousPomodoro(self) -> None:
+        """
+        L{Day.currentPomodoro} is the pomodoro in progress, or the one that
+        just elapsed if we're on a break; L{Day.previousPomodoro} is the one
+        before that.
+        """
+        day = Day.new(
+            time(9),
+            time(17),
+            date(2021, 9, 1),
+            timezone.utc,
+            longBreaks=[],
+        )
+        self.assertIs(day.currentPomodoro(), day.pendingIntervals[0])
+        self.assertIs(day.previousPomodoro(), None)
+        first, firstBreak, second = day.pendingIntervals[:3]
+        assert isinstance(first, Pomodoro)
+        assert isinstance(second, Pomodoro)
+        # on the first break
+        day.elapsedIntervals.append(day.pendingIntervals.pop(0))
+        self.assertIs(day.currentPomodoro(), first)
+        self.assertIs(day.previousPomodoro(), None)
+        # in the second pomodoro
+        day.elapsedIntervals.append(day.pendingIntervals.pop(0))
+        self.assertIs(day.currentPomodoro(), second)
+        self.assertIs(day.previousPomodoro(), first)
+        # on the second break
+        day.elapsedIntervals.append(day.pendingIntervals.pop(0))
+        self.assertIs(day.currentPomodoro(), second)
+        self.assertIs(day.previousPomodoro(), first)